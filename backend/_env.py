@@ -0,0 +1,28 @@
+"""
+Shared environment for the backend test scripts
+Loads .env.local once and exposes the API keys as a frozen config object
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# .env.local lives at the project root, next to the backend/ directory
+load_dotenv(Path(__file__).resolve().parent.parent / ".env.local")
+
+
+@dataclass(frozen=True, slots=True)
+class Env:
+    google_api_key: Optional[str]
+    mistral_api_key: Optional[str]
+    portia_api_key: Optional[str]
+
+
+ENV = Env(
+    google_api_key=os.getenv("GOOGLE_API_KEY"),
+    mistral_api_key=os.getenv("MISTRAL_API_KEY"),
+    portia_api_key=os.getenv("PORTIA_API_KEY"),
+)
@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import json
 import random
@@ -34,7 +35,8 @@ print("💡 Running in DEMO MODE - simulating working responses due to API limit
 app = FastAPI(
     title="Nexus Backend - Demo Mode", 
     version="3.1.0",
-    description="Demo mode with simulated responses and tool extraction"
+    description="Demo mode with simulated responses and tool extraction",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -267,9 +269,15 @@ async def health_check():
         }
     }
 
-@app.post("/query")
-async def query_llm(request: QueryRequest) -> QueryResponse:
+@app.post("/query", response_model=None, responses={200: {"model": QueryResponse}})
+async def query_llm(request: QueryRequest) -> ORJSONResponse:
     """Process query with demo responses"""
+    # QueryResponse is only documented, not re-validated by FastAPI on the way out
+    response = await _demo_query(request)
+    return ORJSONResponse(response.model_dump())
+
+async def _demo_query(request: QueryRequest) -> QueryResponse:
+    """Build the simulated QueryResponse for a demo query"""
     start_time = time.time()
     
     # Support both query and message fields
@@ -383,4 +391,13 @@ if __name__ == "__main__":
     print("🚀 Starting server on http://localhost:8000")
     print("📖 API Docs: http://localhost:8000/docs")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop/httptools ship with uvicorn[standard]; fall back to asyncio/h11 without them
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "asyncio", "h11"
+    print(f"⚙️  Event loop: {loop}, HTTP parser: {http}")
+    
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http=http, interface="asgi3")
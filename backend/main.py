@@ -31,14 +31,34 @@ Following Portia documentation exactly:
 """
 
 import os
+import re
+import sys
 import time
+import queue
+import atexit
+import asyncio
+import importlib
+import logging
+import logging.handlers
+import operator
+import hashlib
+import functools
 import concurrent.futures
+from collections import OrderedDict, deque
+import orjson
 from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, SecretStr
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, SecretStr, ValidationError
+from pydantic.dataclasses import dataclass
 from dotenv import load_dotenv
 
+from services.run_guard import CircuitBreaker, adaptive_timeout
+from services.semantic_cache import SemanticCache
+
 from portia import (
     Portia,
     Config,
@@ -47,60 +67,189 @@ from portia import (
     open_source_tool_registry,
     default_config
 )
-from pydantic import SecretStr
 
 # Load environment variables
 load_dotenv("../.env.local")
 
+# Logging: request paths only enqueue records; a listener thread formats and writes them
+_log_queue = queue.Queue(-1)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger("nexus")
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+
+# Access log is opt-in (NEXUS_ACCESS_LOG=1); when on it is also only enqueued per request
+ACCESS_LOG = os.getenv("NEXUS_ACCESS_LOG") == "1"
+_access_logger = logging.getLogger("uvicorn.access")
+_access_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+_access_logger.setLevel(logging.INFO)
+_access_logger.propagate = False
+
 # Configuration - Check Google and Mistral API keys only (OpenAI removed)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 PORTIA_API_KEY = os.getenv("PORTIA_API_KEY")
 
-print("🚀 Starting Nexus Portia Backend - Google & Mistral Only")
-print("🔑 API Key Status:")
-print(f"   Google: {'✅' if GOOGLE_API_KEY else '❌'}")
-print(f"   Mistral: {'✅' if MISTRAL_API_KEY else '❌'}")
-print(f"   Portia: {'✅' if PORTIA_API_KEY else '❌'}")
-print("   OpenAI: ❌ Disabled (removed from configuration)")
+# Set NEXUS_QUIET=1 to silence the startup banners (CI/test runs)
+NEXUS_QUIET = os.getenv("NEXUS_QUIET") == "1"
+
+if not NEXUS_QUIET:
+    sys.stdout.write("\n".join([
+        "🚀 Starting Nexus Portia Backend - Google & Mistral Only",
+        "🔑 API Key Status:",
+        f"   Google: {'✅' if GOOGLE_API_KEY else '❌'}",
+        f"   Mistral: {'✅' if MISTRAL_API_KEY else '❌'}",
+        f"   Portia: {'✅' if PORTIA_API_KEY else '❌'}",
+        "   OpenAI: ❌ Disabled (removed from configuration)",
+    ]) + "\n")
+    sys.stdout.flush()
+
+# Shared Portia config and API key secrets, built once and copied per use
+_PORTIA_SECRET = SecretStr(PORTIA_API_KEY) if PORTIA_API_KEY else None
+_GOOGLE_SECRET = SecretStr(GOOGLE_API_KEY) if GOOGLE_API_KEY else None
+_MISTRAL_SECRET = SecretStr(MISTRAL_API_KEY) if MISTRAL_API_KEY else None
+_BASE_CFG = None
+
+def _base_config():
+    """default_config(), built on first use inside the init try blocks (errors degrade, not abort)"""
+    global _BASE_CFG
+    if _BASE_CFG is None:
+        _BASE_CFG = default_config()
+    return _BASE_CFG
+
+def _portia_registry_config():
+    """Base config authenticated against Portia cloud, for registry loading"""
+    return _base_config().model_copy(update={"portia_api_key": _PORTIA_SECRET})
 
 # Create FastAPI app
 app = FastAPI(
     title="Nexus Portia Backend", 
     version="2.0.0",
-    description="Google Gemini & Mistral implementation with full tool integration (OpenAI disabled)"
+    description="Google Gemini & Mistral implementation with full tool integration (OpenAI disabled)",
+    default_response_class=ORJSONResponse
+)
+
+# Dedicated bounded pools: blocking Portia LLM calls never run on the event loop,
+# and startup work (registry loading, instance construction) stays separate
+_LLM_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_WORKERS", "8")),
+    thread_name_prefix="llm"
+)
+_INIT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="init")
+
+@app.on_event("startup")
+async def _set_default_executor():
+    """Route any default-executor work through the bounded LLM pool"""
+    asyncio.get_running_loop().set_default_executor(_LLM_POOL)
+
+# Candidate instances are tried serially: the next one only starts after the
+# previous run fails. The instances have different tool sets and a losing run
+# keeps executing (and can still send email) on its worker thread, so hedging -
+# also starting the next candidate after HEDGE_DELAY_SECONDS - is opt-in.
+_hedge_delay = os.getenv("HEDGE_DELAY_SECONDS")
+HEDGE_DELAY_SECONDS = float(_hedge_delay) if _hedge_delay else None
+HEDGE_MAX_IN_FLIGHT = 2
+
+# Provider errors that indicate rate limiting / quota exhaustion (single pass, case-insensitive)
+_RATE_LIMIT_RE = re.compile(r"rate[ -]?limit|quota|capacity|\b429\b", re.I)
+
+# Per-instance circuit breakers: after repeated instance errors (raised exceptions
+# or rate-limited runs) an instance is skipped until a cooldown passes, then a
+# single probe decides whether it is healthy again
+_BREAKERS = {name: CircuitBreaker() for name in ("cloud", "open_source")}
+
+# Adaptive per-instance run timeouts: 2x the rolling p95 of recent run latencies
+# (at least RUN_MIN_TIMEOUT), once enough samples exist; unbounded before that
+RUN_MIN_TIMEOUT = float(os.getenv("RUN_MIN_TIMEOUT", "5"))
+RUN_TIMEOUT_MIN_SAMPLES = 20
+_LATENCIES = {name: deque(maxlen=200) for name in ("cloud", "open_source")}
+
+def _adaptive_timeout(name) -> Optional[float]:
+    return adaptive_timeout(_LATENCIES[name], RUN_MIN_TIMEOUT, RUN_TIMEOUT_MIN_SAMPLES)
+
+# Polling backoff for run state checks (seconds)
+POLL_INITIAL_DELAY = 0.05
+POLL_MAX_DELAY = 0.5
+
+# Successful query responses, keyed by (message, tool_registry, use_tools).
+# Opt-in (QUERY_CACHE_TTL > 0): queries can use side-effecting cloud tools
+# ("send X to Y" must actually send every time) or time-sensitive ones (weather,
+# latest emails), so by default every request runs its own query. Request
+# coalescing and the semantic tier below follow the same switch.
+QUERY_CACHE_MAXSIZE = int(os.getenv("QUERY_CACHE_MAXSIZE", "4096"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "0"))
+_QUERY_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+# Queries currently being answered, keyed like the cache (request coalescing)
+_INFLIGHT: Dict[bytes, "asyncio.Future"] = {}
+
+# Optional second tier: near-duplicate queries by embedding similarity.
+# Opt-in (e.g. SEMANTIC_CACHE_MODEL=sentence-transformers/all-MiniLM-L6-v2) since
+# similar-looking prompts ("15 * 24" vs "15 * 25") can need different answers.
+_SEMANTIC_CACHE = SemanticCache(
+    os.getenv("SEMANTIC_CACHE_MODEL"),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "14400"))
 )
 
-# CORS
+# Global request timeout (seconds); must exceed the 60s run polling budget
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "90"))
+
+@app.middleware("http")
+async def timeout_middleware(request, call_next):
+    """Bound every request; stuck provider calls return 504 instead of piling up"""
+    try:
+        return await asyncio.wait_for(call_next(request), timeout=REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("⏰ Request timed out after %ss: %s %s", REQUEST_TIMEOUT, request.method, request.url.path)
+        return ORJSONResponse(
+            {"success": False, "error": f"Request timed out after {REQUEST_TIMEOUT}s"},
+            status_code=504
+        )
+
+# CORS (added after the timeout middleware so it wraps 504 responses too).
+# Deployed frontends opt in via CORS_ORIGIN_REGEX; Starlette fullmatches it and
+# credentials are allowed, so anchor it to your own deployment, e.g.
+# https://nexus-agent-hack(-[a-z0-9-]+)?-<team>\.vercel\.app - never a free ".*".
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
+    allow_origin_regex=os.getenv("CORS_ORIGIN_REGEX") or None,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["X-Cache"],
 )
 
+# Compress larger JSON bodies (tool lists, query results); small ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 def load_portia_registry_with_timeout(config, timeout=15):
     
-    print(f"   📡 Loading cloud tool registry (timeout: {timeout}s)...")
+    logger.info("   📡 Loading cloud tool registry (timeout: %ss)...", timeout)
     
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(PortiaToolRegistry, config=config)
-        try:
-            start_time = time.time()
-            registry = future.result(timeout=timeout)
-            load_time = time.time() - start_time
-            print(f"   ✅ Cloud registry loaded in {load_time:.2f}s")
-            return registry
-        except concurrent.futures.TimeoutError:
-            print(f"   ⏰ Timeout: PortiaToolRegistry initialization took longer than {timeout}s")
-            print("   🔄 Falling back to open source tools only")
-            return None
-        except Exception as e:
-            print(f"   ❌ Cloud registry failed: {e}")
-            print("   🔄 Falling back to open source tools only")
-            return None
+    future = _INIT_POOL.submit(PortiaToolRegistry, config=config)
+    try:
+        start_time = time.time()
+        registry = future.result(timeout=timeout)
+        load_time = time.time() - start_time
+        logger.info("   ✅ Cloud registry loaded in %.2fs", load_time)
+        return registry
+    except concurrent.futures.TimeoutError:
+        logger.warning("   ⏰ Timeout: PortiaToolRegistry initialization took longer than %ss", timeout)
+        logger.info("   🔄 Falling back to open source tools only")
+        return None
+    except Exception as e:
+        logger.error("   ❌ Cloud registry failed: %s", e)
+        logger.info("   🔄 Falling back to open source tools only")
+        return None
 
 def create_portia_instance_with_timeout(config, timeout=15):
     """
@@ -112,47 +261,44 @@ def create_portia_instance_with_timeout(config, timeout=15):
         
         if tools_registry is None:
             # Fallback to open source tools only
-            print("   📦 Using open source tools as fallback")
+            logger.info("   📦 Using open source tools as fallback")
             return Portia(config=config, tools=open_source_tool_registry)
         
         # Use cloud registry
         return Portia(config=config, tools=tools_registry)
         
     except Exception as e:
-        print(f"   ❌ Portia instance creation failed: {e}")
+        logger.error("   ❌ Portia instance creation failed: %s", e)
         # Final fallback to open source only
-        print("   📦 Final fallback to open source tools")
+        logger.info("   📦 Final fallback to open source tools")
         return Portia(config=config, tools=open_source_tool_registry)
 
 # Initialize tool registries
 def initialize_tool_registries():
     """Initialize both open source and cloud tool registries with timeout protection"""
-    print("📦 Loading tool registries...")
+    logger.info("📦 Loading tool registries...")
     
     # Open source tools
     os_tools = open_source_tool_registry.get_tools()
-    print(f"✅ Open Source Tools: {len(os_tools)} loaded")
+    logger.info("✅ Open Source Tools: %s loaded", len(os_tools))
     
     # Cloud tools using timeout-protected loading
     cloud_tools = []
     cloud_registry = None
     if PORTIA_API_KEY:
         try:
-            print("☁️ Loading cloud tool registry...")
+            logger.info("☁️ Loading cloud tool registry...")
             # Use timeout-protected loading with proper config
-            config = default_config()
-            if PORTIA_API_KEY:
-                config.portia_api_key = SecretStr(PORTIA_API_KEY)
-            cloud_registry = load_portia_registry_with_timeout(config)
+            cloud_registry = load_portia_registry_with_timeout(_portia_registry_config())
             if cloud_registry:
                 cloud_tools = cloud_registry.get_tools()
-                print(f"✅ Cloud Tools: {len(cloud_tools)} loaded")
+                logger.info("✅ Cloud Tools: %s loaded", len(cloud_tools))
             else:
-                print("⚠️ Cloud tools registry timeout - using open source only")
+                logger.warning("⚠️ Cloud tools registry timeout - using open source only")
         except Exception as e:
-            print(f"⚠️ Cloud tools not available: {e}")
+            logger.warning("⚠️ Cloud tools not available: %s", e)
     else:
-        print("⚠️ No PORTIA_API_KEY - cloud tools disabled")
+        logger.warning("⚠️ No PORTIA_API_KEY - cloud tools disabled")
     
     return os_tools, cloud_tools, cloud_registry
 
@@ -162,44 +308,45 @@ total_tools = len(os_tools) + len(cloud_tools)
 
 # Note: Using official PortiaToolRegistry pattern in provider initialization
 # Each Portia instance automatically gets the latest cloud tools from dashboard
-print(f"📊 Tool Summary: {len(os_tools)} open source, {len(cloud_tools)} cloud tools available")
-print("☁️  Cloud tools are managed via Portia dashboard and automatically reflected")
+logger.info("📊 Tool Summary: %s open source, %s cloud tools available", len(os_tools), len(cloud_tools))
+logger.info("☁️  Cloud tools are managed via Portia dashboard and automatically reflected")
 
 # Initialize LLM providers using the CORRECT Portia pattern from official docs
 portia_instance_cloud = None
 portia_instance_open_source = None
 
-def initialize_providers():
+def _build_portia_instance(name, config, tools):
+    """Construct a Portia instance; runs on a worker thread during startup"""
+    return name, Portia(config=config, tools=tools)
+
+def initialize_providers(timeout=20):
     """Initialize LLM provider using the official Portia documentation pattern"""
     global portia_instance_cloud, portia_instance_open_source
     
-    print("🔧 Initializing LLM provider using official Portia pattern...")
-    
-    # Create shared cloud registry once
-    shared_cloud_registry = None
-    if PORTIA_API_KEY and cloud_registry:
-        print("🔄 Reusing existing cloud registry...")
-        shared_cloud_registry = cloud_registry
-    elif PORTIA_API_KEY:
-        print("📡 Loading cloud registry...")
-        config = default_config()
-        config.portia_api_key = SecretStr(PORTIA_API_KEY)
-        shared_cloud_registry = load_portia_registry_with_timeout(config)
+    logger.info("🔧 Initializing LLM provider using official Portia pattern...")
     
     try:
-        # OFFICIAL PATTERN: Single config with all API keys, automatic provider inference
-        config = default_config()
+        # Create shared cloud registry once
+        shared_cloud_registry = None
+        if PORTIA_API_KEY and cloud_registry:
+            logger.info("🔄 Reusing existing cloud registry...")
+            shared_cloud_registry = cloud_registry
+        elif PORTIA_API_KEY:
+            logger.info("📡 Loading cloud registry...")
+            shared_cloud_registry = load_portia_registry_with_timeout(_portia_registry_config())
         
+        # OFFICIAL PATTERN: Single config with all API keys, automatic provider inference
         # Set all API keys in the config (official pattern - Google & Mistral only)
-        if PORTIA_API_KEY:
-            config.portia_api_key = SecretStr(PORTIA_API_KEY)
-        if GOOGLE_API_KEY:
-            config.google_api_key = SecretStr(GOOGLE_API_KEY)
-        if MISTRAL_API_KEY:
-            config.mistralai_api_key = SecretStr(MISTRAL_API_KEY)
-        
-        # Set primary provider (Google since it's working)
-        config.llm_provider = LLMProvider.GOOGLE
+        # Primary provider is Google since it's working
+        secrets = {
+            "portia_api_key": _PORTIA_SECRET,
+            "google_api_key": _GOOGLE_SECRET,
+            "mistralai_api_key": _MISTRAL_SECRET,
+        }
+        config = _base_config().model_copy(update={
+            "llm_provider": LLMProvider.GOOGLE,
+            **{field: secret for field, secret in secrets.items() if secret is not None}
+        })
         
         # Force specific Google models to prevent any OpenAI fallback
         try:
@@ -213,46 +360,97 @@ def initialize_providers():
                 planning_model="google/gemini-1.5-flash",
                 execution_model="google/gemini-1.5-flash"
             )
-            print("✅ Using explicit Google model configuration")
+            logger.info("✅ Using explicit Google model configuration")
         except Exception as e:
-            print(f"⚠️ Explicit model config failed, using basic config: {e}")
+            logger.warning("⚠️ Explicit model config failed, using basic config: %s", e)
             # Fallback to basic config
             pass
         
-        # Create cloud instance for Gmail and Google Workspace tools
+        # Build the cloud instance (Gmail, Google Workspace) and the open source
+        # instance (weather, calculator) concurrently - cold start is max-of-two
+        # instead of sum-of-two
+        builds = [("open_source", open_source_tool_registry)]
         if shared_cloud_registry:
-            print("🔧 Creating cloud instance for Gmail and Google Workspace tools")
-            portia_instance_cloud = Portia(config=config, tools=shared_cloud_registry)
-            print(f"✅ Cloud instance: {len(shared_cloud_registry.get_tools())} tools (includes Gmail, Google Docs, etc.)")
+            logger.info("🔧 Creating cloud instance for Gmail and Google Workspace tools")
+            builds.append(("cloud", shared_cloud_registry))
         else:
-            print("⚠️ Cloud registry not available")
+            logger.warning("⚠️ Cloud registry not available")
+        logger.info("🔧 Creating open source instance for weather and basic tools")
         
-        # Create open source instance for weather and other open source tools
-        print("🔧 Creating open source instance for weather and basic tools")
-        portia_instance_open_source = Portia(config=config, tools=open_source_tool_registry)
-        print(f"✅ Open source instance: {len(open_source_tool_registry.get_tools())} tools (includes weather, calculator, etc.)")
+        instances = {}
+        futures = [
+            _INIT_POOL.submit(_build_portia_instance, name, config, tools)
+            for name, tools in builds
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                try:
+                    name, instance = future.result()
+                    instances[name] = instance
+                except Exception as e:
+                    logger.warning("⚠️ Portia instance creation failed: %s", e)
+        except concurrent.futures.TimeoutError:
+            logger.warning("⏰ Timeout: Portia instance creation took longer than %ss", timeout)
+        
+        portia_instance_cloud = instances.get("cloud")
+        portia_instance_open_source = instances.get("open_source")
+        
+        if portia_instance_cloud:
+            logger.info("✅ Cloud instance: %s tools (includes Gmail, Google Docs, etc.)", len(shared_cloud_registry.get_tools()))
+        if portia_instance_open_source is None:
+            raise RuntimeError("Open source Portia instance could not be created")
+        logger.info("✅ Open source instance: %s tools (includes weather, calculator, etc.)", len(open_source_tool_registry.get_tools()))
         
-        print(f"✅ Portia instances initialized with Google as primary provider")
-        print(f"✅ Available fallback provider: Mistral (OpenAI disabled)")
+        logger.info("✅ Portia instances initialized with Google as primary provider")
+        logger.info("✅ Available fallback provider: Mistral (OpenAI disabled)")
         
     except Exception as e:
-        print(f"❌ Portia instance initialization failed: {e}")
+        logger.error("❌ Portia instance initialization failed: %s", e)
         # Fallback to open source only
         try:
-            config = default_config()
-            config.llm_provider = LLMProvider.GOOGLE
-            config.google_api_key = SecretStr(GOOGLE_API_KEY)
-            portia_instance = Portia(config=config, tools=open_source_tool_registry)
-            print(f"✅ Fallback: Portia initialized with open source tools only")
+            config = _base_config().model_copy(update={
+                "llm_provider": LLMProvider.GOOGLE,
+                "google_api_key": _GOOGLE_SECRET
+            })
+            portia_instance_open_source = Portia(config=config, tools=open_source_tool_registry)
+            logger.info("✅ Fallback: Portia initialized with open source tools only")
         except Exception as e2:
-            print(f"❌ Complete initialization failure: {e2}")
-            portia_instance = None
-        except Exception as e:
-            print(f"⚠️ Mistral provider failed: {e}")
+            logger.error("❌ Complete initialization failure: %s", e2)
+            portia_instance_open_source = None
 
 # Initialize providers
 initialize_providers()
 
+# LLM SDK modules Portia imports lazily on the first run (Google primary, Mistral fallback)
+_WARMUP_MODULES = ("langchain_google_genai", "google.generativeai", "langchain_mistralai", "mistralai")
+# Optional query to run once at startup so the first real request is warm (costs one LLM call)
+NEXUS_WARMUP_QUERY = os.getenv("NEXUS_WARMUP_QUERY")
+
+def _warm_up():
+    """Pre-import provider SDKs, load the semantic cache model and optionally run a warm-up query"""
+    for module in _WARMUP_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    if _SEMANTIC_CACHE.enabled:
+        try:
+            _SEMANTIC_CACHE.embed("warm-up")
+        except Exception as e:
+            logger.warning("⚠️ Semantic cache model failed to load: %s", e)
+    instance = portia_instance_open_source or portia_instance_cloud
+    if NEXUS_WARMUP_QUERY and instance:
+        try:
+            instance.run(NEXUS_WARMUP_QUERY)
+            logger.info("✅ Warm-up query completed")
+        except Exception as e:
+            logger.warning("⚠️ Warm-up query failed: %s", e)
+
+@app.on_event("startup")
+async def _start_warm_up():
+    """Warm up in the background so startup is not delayed"""
+    _INIT_POOL.submit(_warm_up)
+
 # Request/Response models
 class QueryRequest(BaseModel):
     message: str
@@ -266,14 +464,18 @@ class ClarificationRequest(BaseModel):
     response: str  # User's response to the clarification
     user_id: Optional[str] = None
 
-class ClarificationModel(BaseModel):
+# Response types are slotted pydantic dataclasses: fixed layout instead of a
+# per-instance __dict__, and orjson serializes them natively
+@dataclass(slots=True, kw_only=True, config=ConfigDict(extra='forbid'))
+class ClarificationModel:
     """Model for Portia clarifications requiring user intervention"""
     type: str  # Type of clarification (e.g., "oauth", "input", "permission")
     message: str  # Human-readable message to show the user
     details: Optional[Dict[str, Any]] = None  # Additional context/data
     action_required: str  # What action the user needs to take
 
-class QueryResponse(BaseModel):
+@dataclass(slots=True, kw_only=True, config=ConfigDict(extra='forbid'))
+class QueryResponse:
     success: bool
     result: Optional[str] = None
     tools_used: Optional[List[str]] = None
@@ -283,162 +485,399 @@ class QueryResponse(BaseModel):
     clarification: Optional[ClarificationModel] = None  # Portia clarification requiring user action
     requires_user_action: bool = False  # Quick flag to check if user intervention needed
 
-# API Endpoints
-@app.get("/health")
-async def health_check():
-    """Enhanced health check"""
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "provider": {
-            "available": portia_instance_cloud is not None or portia_instance_open_source is not None,
-            "primary": "google" if (portia_instance_cloud or portia_instance_open_source) else None,
-            "fallbacks": ["mistral"] if (portia_instance_cloud or portia_instance_open_source) else [],
-            "disabled": ["openai"],
-            "note": "OpenAI removed due to quota issues"
-        },
-        "tools": {
-            "open_source_count": len(os_tools),
-            "cloud_count": len(cloud_tools), 
-            "total_count": total_tools
+# Precomputed JSON payloads - tools and instances are fixed after startup,
+# so these endpoints only copy bytes instead of building and encoding dicts
+_provider_available = portia_instance_cloud is not None or portia_instance_open_source is not None
+
+# /health: only the timestamp changes per request
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":'
+_HEALTH_SUFFIX = b"," + orjson.dumps({
+    "provider": {
+        "available": _provider_available,
+        "primary": "google" if _provider_available else None,
+        "fallbacks": ["mistral"] if _provider_available else [],
+        "disabled": ["openai"],
+        "note": "OpenAI removed due to quota issues"
+    },
+    "tools": {
+        "open_source_count": len(os_tools),
+        "cloud_count": len(cloud_tools),
+        "total_count": total_tools
+    },
+    "cloud_registry": {
+        "available": cloud_registry is not None,
+        "authenticated": PORTIA_API_KEY is not None
+    }
+})[1:]
+
+def _tool_entries(tools, default_category):
+    """Flatten tool objects into plain dicts once, for serialization at startup"""
+    return [
+        {
+            "id": tool.id,
+            "name": tool.name,
+            "description": tool.description,
+            "category": getattr(tool, 'category', default_category)
+        }
+        for tool in tools
+    ]
+
+_TOOLS_OS_JSON = orjson.dumps({
+    "success": True,
+    "tools": _tool_entries(os_tools, 'general'),
+    "count": len(os_tools)
+})
+
+_TOOLS_CLOUD_JSON = orjson.dumps({
+    "success": True,
+    "tools": _tool_entries(cloud_tools, 'cloud'),
+    "count": len(cloud_tools),
+    "available": len(cloud_tools) > 0
+})
+
+_REGISTRIES_JSON = orjson.dumps({
+    "success": True,
+    "registries": {
+        "open_source": {
+            "name": "Open Source Tool Registry",
+            "available": True,
+            "tool_count": len(os_tools),
+            "status": "active"
         },
-        "cloud_registry": {
+        "cloud": {
+            "name": "Portia Cloud Tool Registry",
             "available": cloud_registry is not None,
+            "tool_count": len(cloud_tools),
+            "status": "active" if cloud_registry is not None else "disabled",
             "authenticated": PORTIA_API_KEY is not None
         }
+    },
+    "total_tools": total_tools,
+    "summary": {
+        "registries_active": 1 + (1 if cloud_registry is not None else 0),
+        "total_registries": 2
     }
+})
+
+# API Endpoints
+@app.get("/health")
+async def health_check():
+    """Enhanced health check"""
+    return Response(
+        content=_HEALTH_PREFIX + orjson.dumps(time.time()) + _HEALTH_SUFFIX,
+        media_type="application/json"
+    )
 
 @app.get("/tools/open-source")
 async def list_open_source_tools():
     """List available open source tools"""
-    return {
-        "success": True,
-        "tools": [
-            {
-                "id": tool.id,
-                "name": tool.name, 
-                "description": tool.description,
-                "category": getattr(tool, 'category', 'general')
-            }
-            for tool in os_tools
-        ],
-        "count": len(os_tools)
-    }
+    return Response(content=_TOOLS_OS_JSON, media_type="application/json")
 
 @app.get("/tools/cloud") 
 async def list_cloud_tools():
     """List available cloud tools"""
-    return {
-        "success": True,
-        "tools": [
-            {
-                "id": tool.id,
-                "name": tool.name,
-                "description": tool.description, 
-                "category": getattr(tool, 'category', 'cloud')
-            }
-            for tool in cloud_tools
-        ],
-        "count": len(cloud_tools),
-        "available": len(cloud_tools) > 0
-    }
+    return Response(content=_TOOLS_CLOUD_JSON, media_type="application/json")
 
 @app.get("/tools/registries")
 async def list_tool_registries():
     """List available tool registries and their status"""
+    return Response(content=_REGISTRIES_JSON, media_type="application/json")
+
+@app.get("/status")
+async def instance_status():
+    """Circuit breaker state of each Portia instance"""
     return {
         "success": True,
-        "registries": {
-            "open_source": {
-                "name": "Open Source Tool Registry",
-                "available": True,
-                "tool_count": len(os_tools),
-                "status": "active"
-            },
-            "cloud": {
-                "name": "Portia Cloud Tool Registry", 
-                "available": cloud_registry is not None,
-                "tool_count": len(cloud_tools),
-                "status": "active" if cloud_registry is not None else "disabled",
-                "authenticated": PORTIA_API_KEY is not None
+        "instances": {
+            name: {
+                "available": instance is not None,
+                "breaker": _BREAKERS[name].snapshot()
             }
-        },
-        "total_tools": total_tools,
-        "summary": {
-            "registries_active": 1 + (1 if cloud_registry is not None else 0),
-            "total_registries": 2
+            for name, instance in (("cloud", portia_instance_cloud), ("open_source", portia_instance_open_source))
         }
     }
 
-@app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+@app.post(
+    "/query",
+    response_class=ORJSONResponse,
+    responses={200: {"model": QueryResponse}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": QueryRequest.model_json_schema()}}
+        }
+    }
+)
+async def process_query(http_request: Request):
     """
     Process query with appropriate Portia instance based on tool registry selection
     Automatic fallback providers handled by Portia internally
     """
+    # Single-pass parse + validate of the raw body (pydantic-core's JSON parser)
+    try:
+        request = QueryRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI gives body params: locations start with "body"
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    
+    if QUERY_CACHE_TTL <= 0:
+        # Caching and coalescing disabled: every request runs its own query
+        return ORJSONResponse(await _run_query(request), headers={"X-Cache": "BYPASS"})
+    
+    key = _query_cache_key(request)
+    cached = _query_cache_get(key)
+    if cached is not None:
+        logger.info("⚡ Cache hit for query: '%s'", request.message)
+        return ORJSONResponse(cached, headers={"X-Cache": "HIT"})
+    
+    # Single-flight: concurrent identical queries share one in-flight task. It is
+    # not owned by any request, so a client disconnect or 504 only stops that
+    # request's wait (shield) - the run and the other waiters carry on.
+    in_flight = _INFLIGHT.get(key)
+    coalesced = in_flight is not None
+    if coalesced:
+        logger.info("🔗 Joining in-flight query: '%s'", request.message)
+    else:
+        in_flight = asyncio.create_task(_answer_uncached(request, key))
+        _INFLIGHT[key] = in_flight
+        in_flight.add_done_callback(functools.partial(_inflight_done, key))
+    
+    response, cache_status = await asyncio.shield(in_flight)
+    
+    # QueryResponse is only documented, not re-validated by FastAPI on the way out
+    return ORJSONResponse(response, headers={"X-Cache": "COALESCED" if coalesced else cache_status})
+
+def _inflight_done(key: bytes, task: "asyncio.Task") -> None:
+    """Unregister a finished single-flight task"""
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved even if every waiter has gone away
+
+async def _answer_uncached(request: QueryRequest, key: bytes):
+    """Answer from the semantic cache or a Portia run; returns (response, X-Cache status)"""
+    embedding = None
+    scope = f"{request.tool_registry}|{request.use_tools}"
+    if _SEMANTIC_CACHE.enabled and QUERY_CACHE_TTL > 0:
+        loop = asyncio.get_running_loop()
+        try:
+            embedding = await loop.run_in_executor(_LLM_POOL, _SEMANTIC_CACHE.embed, _normalize_query(request.message))
+        except Exception as e:
+            # The semantic tier is best-effort: a model failure is just a cache miss
+            logger.warning("⚠️ Semantic cache embedding failed: %s", e)
+        cached = _SEMANTIC_CACHE.lookup(scope, embedding) if embedding is not None else None
+        if cached is not None:
+            logger.info("⚡ Semantic cache hit for query: '%s'", request.message)
+            _query_cache_put(key, cached)
+            return cached, "SEMANTIC_HIT"
+    
+    response = await _run_query(request)
+    if response.success:
+        _query_cache_put(key, response)
+        if embedding is not None:
+            _SEMANTIC_CACHE.add(scope, embedding, response)
+    return response, "MISS"
+
+def _normalize_query(message: str) -> str:
+    """Case- and whitespace-insensitive form of a query, for cache keys"""
+    return " ".join(message.split()).casefold()
+
+def _query_cache_key(request: QueryRequest) -> bytes:
+    """Compact digest of the fields that determine a query's result"""
+    raw = f"{_normalize_query(request.message)}|{request.tool_registry}|{request.use_tools}".encode()
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+def _query_cache_get(key: bytes) -> Optional["QueryResponse"]:
+    """Return a cached response if present and not expired"""
+    entry = _QUERY_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if time.monotonic() >= expires_at:
+        del _QUERY_CACHE[key]
+        return None
+    _QUERY_CACHE.move_to_end(key)
+    return response
+
+def _query_cache_put(key: bytes, response: "QueryResponse") -> None:
+    """Store a response, evicting the least recently used entry when full"""
+    if QUERY_CACHE_TTL <= 0 or QUERY_CACHE_MAXSIZE <= 0:
+        return
+    _QUERY_CACHE[key] = (time.monotonic() + QUERY_CACHE_TTL, response)
+    _QUERY_CACHE.move_to_end(key)
+    while len(_QUERY_CACHE) > QUERY_CACHE_MAXSIZE:
+        _QUERY_CACHE.popitem(last=False)
+
+def _record_breaker_failure(name):
+    """Count an instance failure, logging when its breaker opens"""
+    breaker = _BREAKERS[name]
+    breaker.record_failure()
+    if breaker.state == "OPEN":
+        logger.warning("⚠️ Circuit open for %s instance (%ss)", name, breaker.recovery_timeout)
+
+class RunTimeoutError(TimeoutError):
+    """A run exceeded its adaptive timeout while executing on a worker thread"""
+
+async def _timed_run(name, instance, message):
+    """
+    Run message on instance in the LLM pool, bounded by the instance's adaptive
+    timeout. Only time spent on a worker counts: waiting in the pool queue is
+    neither measured nor bounded here (the request timeout still applies).
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.create_future()
+    
+    def work():
+        loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+        begin = time.monotonic()
+        return instance.run(message), time.monotonic() - begin
+    
+    task = loop.run_in_executor(_LLM_POOL, work)
+    try:
+        await asyncio.shield(started)
+    except asyncio.CancelledError:
+        task.cancel()  # drops the run if it is still queued
+        raise
+    
+    timeout = _adaptive_timeout(name)
+    try:
+        run, elapsed = await asyncio.wait_for(task, timeout=timeout)
+    except asyncio.TimeoutError:
+        # The worker thread keeps running the abandoned run until it finishes
+        raise RunTimeoutError(f"no result within {timeout:.1f}s (adaptive timeout)")
+    _LATENCIES[name].append(elapsed)
+    return run
+
+async def _hedged_run(candidates, message):
+    """
+    Run message on the first candidate instance, falling back to the next one
+    only if it fails. With HEDGE_DELAY_SECONDS set, the next candidate is also
+    started once the current run has been going that long (at most
+    HEDGE_MAX_IN_FLIGHT in flight); the first completed, non-failed run wins and
+    the others are cancelled (a run already on a worker thread finishes in the
+    background). Each run is bounded by its instance's adaptive timeout; a run
+    that times out is not retried on the next candidate, since it keeps running.
+    Returns (registry_name, run).
+    """
+    remaining = list(candidates)
+    in_flight = {}
+    launched = False
+    failed = None
+    last_error = None
+    
+    hedging = HEDGE_DELAY_SECONDS is not None
+    
+    def launch_next():
+        # Breakers are consulted only when a candidate is actually about to run:
+        # allow() on an OPEN breaker starts its HALF_OPEN probe
+        while remaining:
+            name, instance = remaining.pop(0)
+            if _BREAKERS[name].allow():
+                in_flight[asyncio.ensure_future(_timed_run(name, instance, message))] = name
+                return True
+        return False
+    
+    try:
+        while True:
+            if remaining and (not in_flight or (hedging and len(in_flight) < HEDGE_MAX_IN_FLIGHT)):
+                launched = launch_next() or launched
+            if not in_flight:
+                break
+            can_hedge = hedging and remaining and len(in_flight) < HEDGE_MAX_IN_FLIGHT
+            done, _ = await asyncio.wait(
+                in_flight,
+                timeout=HEDGE_DELAY_SECONDS if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                name = in_flight.pop(task)
+                try:
+                    run = task.result()
+                except Exception as e:
+                    if _RATE_LIMIT_RE.search(str(e)):
+                        logger.warning("⚠️ %s instance rate limited: %s", name, e)
+                    else:
+                        logger.warning("⚠️ %s instance failed: %s", name, e)
+                    _record_breaker_failure(name)
+                    last_error = e
+                    if isinstance(e, RunTimeoutError):
+                        # The timed-out run is still executing and may yet have side
+                        # effects (e.g. send an email), so don't repeat the query elsewhere
+                        remaining.clear()
+                    continue
+                if run.state.value == 'FAILED':
+                    error = str(getattr(run, 'error', 'Unknown error'))
+                    logger.warning("⚠️ %s instance run failed: %s", name, error)
+                    # A task-level failure still proves the instance is reachable
+                    if _RATE_LIMIT_RE.search(error):
+                        _record_breaker_failure(name)
+                    else:
+                        _BREAKERS[name].record_success()
+                    failed = (name, run)
+                    continue
+                _BREAKERS[name].record_success()
+                return name, run
+    finally:
+        # Cancelled (e.g. request timeout) or done: don't leave runs queued in the pool
+        for task in in_flight:
+            task.cancel()
+    
+    # Every candidate failed; surface the failed run if there is one
+    if failed is not None:
+        return failed
+    if not launched:
+        raise ValueError("All Portia instances are unavailable (circuit open), please retry shortly")
+    raise last_error or ValueError("No Portia instances available")
+
+async def _run_query(request: QueryRequest) -> QueryResponse:
+    """Select a Portia instance, run the query and build the QueryResponse"""
     start_time = time.time()
     
     try:
-        print(f"📝 Processing query: '{request.message}'")
-        print(f"🔧 Requested tool registry: {request.tool_registry}")
+        logger.info("📝 Processing query: '%s'", request.message)
+        logger.info("🔧 Requested tool registry: %s", request.tool_registry)
         
-        # Select the appropriate Portia instance based on tool registry
+        # Select candidate Portia instances, in priority order, for the tool registry
         if request.tool_registry == "cloud" and portia_instance_cloud:
-            portia_instance = portia_instance_cloud
-            registry_used = "cloud"
-            print(f"🔧 Using cloud instance (Gmail, Google Docs, etc.)")
+            candidates = [("cloud", portia_instance_cloud)]
+            logger.info("🔧 Using cloud instance (Gmail, Google Docs, etc.)")
         elif request.tool_registry == "open_source" and portia_instance_open_source:
-            portia_instance = portia_instance_open_source
-            registry_used = "open_source"
-            print(f"🔧 Using open source instance (weather, calculator, etc.)")
-        elif request.tool_registry == "default" or request.tool_registry == "combined":
-            # For combined/default, prefer cloud if available (includes more tools)
-            if portia_instance_cloud:
-                portia_instance = portia_instance_cloud
-                registry_used = "cloud"
-                print(f"🔧 Using cloud instance for default/combined (includes Gmail + Google tools)")
-            elif portia_instance_open_source:
-                portia_instance = portia_instance_open_source
-                registry_used = "open_source"
-                print(f"🔧 Fallback to open source instance")
-            else:
-                raise ValueError("No Portia instances available")
+            candidates = [("open_source", portia_instance_open_source)]
+            logger.info("🔧 Using open source instance (weather, calculator, etc.)")
         else:
-            # Fallback logic
-            if portia_instance_cloud:
-                portia_instance = portia_instance_cloud
-                registry_used = "cloud"
-                print(f"🔧 Fallback to cloud instance")
-            elif portia_instance_open_source:
-                portia_instance = portia_instance_open_source
-                registry_used = "open_source"
-                print(f"🔧 Fallback to open source instance")
-            else:
+            # For combined/default (and as fallback), prefer cloud since it includes
+            # more tools (Gmail + Google tools); open source only if the cloud run fails
+            candidates = [
+                (name, instance)
+                for name, instance in (("cloud", portia_instance_cloud), ("open_source", portia_instance_open_source))
+                if instance
+            ]
+            if not candidates:
                 raise ValueError("No Portia instances available")
+            logger.info("🔧 Using %s for '%s' registry", " → ".join(name for name, _ in candidates), request.tool_registry)
         
         if not request.message or not request.message.strip():
             raise ValueError("Empty message provided")
-            
-        if not portia_instance:
-            raise ValueError("Portia instance not initialized")
         
-        print(f"🔍 Running query with Google (primary)...")
+        logger.info("🔍 Running query with Google (primary)...")
         
-        # Run the query using selected instance
-        run = portia_instance.run(request.message)
-        print(f"✅ Run initiated: {run.id}")
+        # Run the query off the event loop, hedging across candidate instances
+        loop = asyncio.get_running_loop()
+        registry_used, run = await _hedged_run(candidates, request.message)
+        logger.info("✅ Run initiated: %s (%s)", run.id, registry_used)
         
         # Wait for completion with proper state checking
         max_wait = 60  # 60 seconds timeout
-        waited = 0
+        deadline = loop.time() + max_wait
+        delay = POLL_INITIAL_DELAY
         
-        while waited < max_wait:
+        while loop.time() < deadline:
             current_state = run.state.value
-            print(f"⏳ State: {current_state} ({waited}s)")
+            logger.debug("⏳ State: %s (%.2fs)", current_state, max_wait - (deadline - loop.time()))
             
             # Check for clarifications (human intervention needed)
             if hasattr(run, 'clarifications') and run.clarifications:
-                print(f"🔄 Clarification required: {len(run.clarifications)} pending")
+                logger.info("🔄 Clarification required: %s pending", len(run.clarifications))
                 clarification = run.clarifications[0]  # Get first clarification
                 
                 clarification_data = ClarificationModel(
@@ -460,11 +899,11 @@ async def process_query(request: QueryRequest):
             if current_state in ['COMPLETE', 'FAILED', 'CANCELLED']:
                 break
             
-            time.sleep(2)
-            waited += 2
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX_DELAY)
         
         final_state = run.state.value
-        print(f"✅ Final state: {final_state}")
+        logger.info("✅ Final state: %s", final_state)
         
         if final_state == 'COMPLETE':
             # Extract result using proper Portia documentation approach
@@ -482,7 +921,7 @@ async def process_query(request: QueryRequest):
                     tool_registry_used=registry_used
                 )
             else:
-                print("❌ No result extracted from successful run")
+                logger.error("❌ No result extracted from successful run")
                 return QueryResponse(
                     success=False,
                     error="No result found in completed run",
@@ -490,7 +929,7 @@ async def process_query(request: QueryRequest):
                 )
         elif final_state == 'FAILED':
             error_msg = f"Run failed: {getattr(run, 'error', 'Unknown error')}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return QueryResponse(
                 success=False,
                 error=error_msg,
@@ -498,7 +937,7 @@ async def process_query(request: QueryRequest):
             )
         else:
             error_msg = f"Run timeout or cancelled (state: {final_state})"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return QueryResponse(
                 success=False,
                 error=error_msg,
@@ -508,42 +947,28 @@ async def process_query(request: QueryRequest):
     except Exception as e:
         execution_time = time.time() - start_time
         error_msg = str(e)
-        print(f"❌ Query processing failed: {error_msg}")
+        logger.error("❌ Query processing failed: %s", error_msg)
         
         return QueryResponse(
             success=False,
             error=error_msg,
             execution_time_seconds=execution_time
         )
-        
-        # All providers failed
-        execution_time = time.time() - start_time
-        return QueryResponse(
-            success=False,
-            error=f"All providers failed. Last error: {last_error}",
-            execution_time_seconds=execution_time,
-            tool_registry_used="all_failed"
-        )
-        
-    except Exception as e:
-        execution_time = time.time() - start_time
-        print(f"❌ Query processing error: {e}")
-        return QueryResponse(
-            success=False,
-            error=str(e),
-            execution_time_seconds=execution_time,
-            tool_registry_used="error"
-        )
 
-@app.post("/clarification", response_model=QueryResponse)
+@app.post("/clarification", response_class=ORJSONResponse, responses={200: {"model": QueryResponse}})
 async def handle_clarification(request: ClarificationRequest):
     """
     Respond to a Portia clarification and continue plan execution
     """
+    # Like /query: the QueryResponse is serialized directly, not re-validated
+    return ORJSONResponse(await _continue_after_clarification(request))
+
+async def _continue_after_clarification(request: ClarificationRequest) -> QueryResponse:
+    """Send the clarification response, wait for the run and build the QueryResponse"""
     start_time = time.time()
     
     try:
-        print(f"🔄 Responding to clarification for plan run: {request.plan_run_id}")
+        logger.info("🔄 Responding to clarification for plan run: %s", request.plan_run_id)
         
         # Try to find the run in either instance
         run = None
@@ -553,7 +978,7 @@ async def handle_clarification(request: ClarificationRequest):
             try:
                 run = portia_instance_cloud.get_run(request.plan_run_id)
                 portia_instance = portia_instance_cloud
-                print(f"✅ Found run in cloud instance")
+                logger.info("✅ Found run in cloud instance")
             except:
                 pass
         
@@ -561,7 +986,7 @@ async def handle_clarification(request: ClarificationRequest):
             try:
                 run = portia_instance_open_source.get_run(request.plan_run_id)
                 portia_instance = portia_instance_open_source
-                print(f"✅ Found run in open source instance")
+                logger.info("✅ Found run in open source instance")
             except:
                 pass
         
@@ -569,23 +994,25 @@ async def handle_clarification(request: ClarificationRequest):
             raise ValueError(f"Plan run not found: {request.plan_run_id}")
         
         # Respond to the clarification
+        loop = asyncio.get_running_loop()
         try:
-            run.respond_to_clarification(request.response)
-            print(f"✅ Clarification response sent: {request.response}")
+            await loop.run_in_executor(_LLM_POOL, run.respond_to_clarification, request.response)
+            logger.info("✅ Clarification response sent: %s", request.response)
         except Exception as e:
             raise ValueError(f"Failed to respond to clarification: {e}")
         
         # Wait for completion after clarification response
         max_wait = 60
-        waited = 0
+        deadline = loop.time() + max_wait
+        delay = POLL_INITIAL_DELAY
         
-        while waited < max_wait:
+        while loop.time() < deadline:
             current_state = run.state.value
-            print(f"⏳ State after clarification: {current_state} ({waited}s)")
+            logger.debug("⏳ State after clarification: %s (%.2fs)", current_state, max_wait - (deadline - loop.time()))
             
             # Check for additional clarifications
             if hasattr(run, 'clarifications') and run.clarifications:
-                print(f"🔄 Additional clarification required: {len(run.clarifications)} pending")
+                logger.info("🔄 Additional clarification required: %s pending", len(run.clarifications))
                 clarification = run.clarifications[0]
                 
                 clarification_data = ClarificationModel(
@@ -607,11 +1034,11 @@ async def handle_clarification(request: ClarificationRequest):
             if current_state in ['COMPLETE', 'FAILED', 'CANCELLED']:
                 break
             
-            time.sleep(2)
-            waited += 2
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX_DELAY)
         
         final_state = run.state.value
-        print(f"✅ Final state after clarification: {final_state}")
+        logger.info("✅ Final state after clarification: %s", final_state)
         
         if final_state == 'COMPLETE':
             result_text = extract_result_from_run(run)
@@ -641,71 +1068,63 @@ async def handle_clarification(request: ClarificationRequest):
             )
             
     except Exception as e:
-        print(f"❌ Clarification handling failed: {e}")
+        logger.error("❌ Clarification handling failed: %s", e)
         return QueryResponse(
             success=False,
             error=f"Clarification handling failed: {str(e)}",
             execution_time_seconds=time.time() - start_time
         )
 
+# Result locations on a PlanRun, tried in order, with the test a found value must
+# pass: run.result counts whenever it is set (0 / False are real results), the
+# output summaries and values only when truthy. Each extractor does a single
+# attribute walk instead of a hasattr probe followed by getattr.
+def _is_set(value) -> bool:
+    return value is not None
+
+_RESULT_EXTRACTORS = [
+    ("run.result", operator.attrgetter("result"), _is_set),
+    ("outputs.final_output.summary", operator.attrgetter("outputs.final_output.summary"), bool),
+    ("outputs.final_output.value", operator.attrgetter("outputs.final_output.value"), bool),
+    ("step_outputs.$result.summary", lambda r: r.outputs.step_outputs["$result"].summary, bool),
+    ("step_outputs.$result.value", lambda r: r.outputs.step_outputs["$result"].value, bool),
+]
+
 def extract_result_from_run(run) -> Optional[str]:
     """
     Extract result from PlanRun following Portia documentation
     The result structure is nested: run.result contains the actual response
     """
     try:
-        # Method 1: Direct result attribute (most common according to docs)
-        if hasattr(run, 'result') and run.result is not None:
-            result_value = run.result
-            print(f"✅ Found result via run.result: {type(result_value)}")
-            return str(result_value)
+        for source, extractor, accept in _RESULT_EXTRACTORS:
+            try:
+                value = extractor(run)
+            except (AttributeError, KeyError, TypeError):
+                continue
+            if accept(value):
+                logger.info("✅ Found result via %s: %s", source, type(value))
+                return str(value)
         
-        # Method 2: Check outputs structure 
-        if hasattr(run, 'outputs') and run.outputs:
-            # Check final_output
-            if hasattr(run.outputs, 'final_output') and run.outputs.final_output:
-                final_out = run.outputs.final_output
-                
-                if hasattr(final_out, 'summary') and final_out.summary:
-                    print("✅ Found result via outputs.final_output.summary")
-                    return str(final_out.summary)
-                
-                if hasattr(final_out, 'value') and final_out.value:
-                    print("✅ Found result via outputs.final_output.value")
-                    return str(final_out.value)
-            
-            # Check step_outputs for $result
-            if hasattr(run.outputs, 'step_outputs') and run.outputs.step_outputs:
-                if '$result' in run.outputs.step_outputs:
-                    step_result = run.outputs.step_outputs['$result']
-                    if hasattr(step_result, 'summary') and step_result.summary:
-                        print("✅ Found result via step_outputs.$result.summary")
-                        return str(step_result.summary)
-                    if hasattr(step_result, 'value') and step_result.value:
-                        print("✅ Found result via step_outputs.$result.value")
-                        return str(step_result.value)
-        
-        print("⚠️ No result found in run object")
+        logger.warning("⚠️ No result found in run object")
         return None
         
     except Exception as e:
-        print(f"❌ Error extracting result: {e}")
+        logger.error("❌ Error extracting result: %s", e)
         return None
 
 def extract_tools_used(run) -> Optional[List[str]]:
     """Extract list of tools used during execution"""
     try:
-        tools_used = []
-        
-        if hasattr(run, 'outputs') and run.outputs:
-            if hasattr(run.outputs, 'step_outputs') and run.outputs.step_outputs:
-                for step_name, step_output in run.outputs.step_outputs.items():
-                    if step_name != '$result':  # Don't include the result step
-                        tools_used.append(step_name)
+        try:
+            step_outputs = run.outputs.step_outputs
+        except AttributeError:
+            return None
         
-        return tools_used if tools_used else None
+        # Step names only - no per-step value/summary lookups or intermediate dicts
+        tools_used = [name for name in (step_outputs or ()) if name != '$result']  # Don't include the result step
+        return tools_used or None
     except Exception as e:
-        print(f"⚠️ Error extracting tools used: {e}")
+        logger.warning("⚠️ Error extracting tools used: %s", e)
         return None
 
 def extract_error_from_run(run) -> str:
@@ -722,19 +1141,50 @@ def extract_error_from_run(run) -> str:
 if __name__ == "__main__":
     import uvicorn
     
-    print("\n" + "="*60)
-    print("🌟 Nexus Portia Backend - Ready!")
-    print("="*60)
-    print("📊 Summary:")
-    print(f"   🔧 LLM Provider: {'✅ Active (Google primary)' if (portia_instance_cloud or portia_instance_open_source) else '❌ Inactive'}")
-    print(f"   📦 Open Source Tools: {len(os_tools)}")
-    print(f"   ☁️  Cloud Tools: {len(cloud_tools)}")
-    print(f"   🔢 Total Tools: {total_tools}")
-    print(f"   🔑 Cloud Registry: {'✅ Active' if cloud_registry else '❌ Inactive'}")
-    print("="*60)
-    print("🚀 Starting server on http://localhost:8000")
-    print("📖 API Docs: http://localhost:8000/docs")
-    print("🏥 Health Check: http://localhost:8000/health")
-    print("="*60)
+    if not NEXUS_QUIET:
+        sys.stdout.write("\n".join([
+            "",
+            "=" * 60,
+            "🌟 Nexus Portia Backend - Ready!",
+            "=" * 60,
+            "📊 Summary:",
+            f"   🔧 LLM Provider: {'✅ Active (Google primary)' if (portia_instance_cloud or portia_instance_open_source) else '❌ Inactive'}",
+            f"   📦 Open Source Tools: {len(os_tools)}",
+            f"   ☁️  Cloud Tools: {len(cloud_tools)}",
+            f"   🔢 Total Tools: {total_tools}",
+            f"   🔑 Cloud Registry: {'✅ Active' if cloud_registry else '❌ Inactive'}",
+            "=" * 60,
+            "🚀 Starting server on http://localhost:8000",
+            "📖 API Docs: http://localhost:8000/docs",
+            "🏥 Health Check: http://localhost:8000/health",
+            "=" * 60,
+        ]) + "\n")
+        sys.stdout.flush()
+    
+    # Registries and Portia instances are built at import, so each extra worker
+    # (which re-imports main via the "main:app" import string) repeats the full
+    # cold start on top of this process's, and caches, single-flight and circuit
+    # breakers are per process. One worker unless WEB_CONCURRENCY asks for more;
+    # LIMIT_CONCURRENCY makes a busy worker answer 503 instead of queueing.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    # uvloop/httptools ship with uvicorn[standard]; fall back to asyncio/h11 without them
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "asyncio", "h11"
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    limit_concurrency = os.getenv("LIMIT_CONCURRENCY")
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        loop=loop,
+        http=http,
+        workers=workers,
+        limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
+        log_config=None,
+        access_log=ACCESS_LOG
+    )
@@ -0,0 +1,58 @@
+"""
+Run guards for Portia instances - circuit breaker and adaptive run timeout
+Free of startup side effects, so they can be used and tested without the app
+"""
+
+import time
+import statistics
+from typing import Any, Dict, Optional, Sequence
+
+
+class CircuitBreaker:
+    """CLOSED -> OPEN after failure_threshold failures; HALF_OPEN probe after recovery_timeout"""
+    
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = "CLOSED"
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    def allow(self) -> bool:
+        """Whether a call may be attempted now (moves OPEN -> HALF_OPEN after cooldown)"""
+        if self.state == "CLOSED":
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.recovery_timeout:
+            return False
+        # Cooldown over, or a previous probe never reported back: allow one probe
+        self.state = "HALF_OPEN"
+        self.opened_at = now
+        return True
+    
+    def record_success(self) -> None:
+        self.state = "CLOSED"
+        self.failures = 0
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "HALF_OPEN" or self.failures >= self.failure_threshold:
+            self.state = "OPEN"
+            self.opened_at = time.monotonic()
+            self.failures = 0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = self.recovery_timeout - (time.monotonic() - self.opened_at)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in_seconds": round(retry_in, 2) if self.state == "OPEN" and retry_in > 0 else 0
+        }
+
+
+def adaptive_timeout(samples: Sequence[float], min_timeout: float, min_samples: int) -> Optional[float]:
+    """2x the p95 of samples (at least min_timeout); None until min_samples exist"""
+    if len(samples) < min_samples:
+        return None
+    p95 = statistics.quantiles(samples, n=20)[18]
+    return max(min_timeout, 2 * p95)
@@ -0,0 +1,116 @@
+"""
+Semantic response cache - near-duplicate query lookup by embedding similarity
+Entries are grouped by scope (e.g. tool registry) so a hit never crosses scopes
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("nexus.semantic_cache")
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # optional dependency - semantic tier is disabled without it
+    np = None
+    SentenceTransformer = None
+
+
+class _ScopeIndex:
+    """Embeddings of one scope as rows of a preallocated float32 matrix, oldest first"""
+
+    __slots__ = ("vectors", "expires", "values", "size")
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.expires = np.empty(capacity, dtype=np.float64)
+        self.values: List[Any] = []
+        self.size = 0
+
+    def keep(self, rows) -> None:
+        """Compact the index down to the given row numbers, preserving order"""
+        count = len(rows)
+        self.vectors[:count] = self.vectors[rows]
+        self.expires[:count] = self.expires[rows]
+        self.values = [self.values[i] for i in rows]
+        self.size = count
+
+    def grow(self, capacity: int) -> None:
+        """Reallocate the buffers to capacity rows"""
+        vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+        expires = np.empty(capacity, dtype=np.float64)
+        vectors[:self.size] = self.vectors[:self.size]
+        expires[:self.size] = self.expires[:self.size]
+        self.vectors, self.expires = vectors, expires
+
+
+class SemanticCache:
+    """Embedding-similarity cache; disabled when no model is configured or installed"""
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, model_name: Optional[str], threshold: float = 0.92,
+                 ttl: float = 4 * 3600, max_entries: int = 4096):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = bool(model_name) and SentenceTransformer is not None
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._scopes: Dict[str, _ScopeIndex] = {}
+
+        if model_name and SentenceTransformer is None:
+            logger.warning("⚠️ sentence-transformers not installed - semantic cache disabled")
+
+    def embed(self, text: str):
+        """Unit-length embedding for text; blocking, call from a worker thread"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logger.info("📦 Loading semantic cache model: %s", self.model_name)
+                    try:
+                        self._model = SentenceTransformer(self.model_name)
+                    except Exception:
+                        # Don't retry a failing load (e.g. no network to download it) per request
+                        self.enabled = False
+                        raise
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def lookup(self, scope: str, embedding) -> Optional[Any]:
+        """Return the cached value most similar to embedding, if above threshold"""
+        index = self._scopes.get(scope)
+        if index is None or index.size == 0:
+            return None
+        size = index.size
+        # One matrix-vector product scores every entry (rows and query are unit length)
+        scores = index.vectors[:size] @ np.asarray(embedding, dtype=np.float32)
+        scores[index.expires[:size] <= time.monotonic()] = -np.inf
+        best = int(scores.argmax())
+        if scores[best] >= self.threshold:
+            return index.values[best]
+        return None
+
+    def add(self, scope: str, embedding, value: Any) -> None:
+        """Store value under embedding, dropping expired and oldest entries"""
+        now = time.monotonic()
+        vector = np.asarray(embedding, dtype=np.float32)
+        index = self._scopes.get(scope)
+        if index is None:
+            index = self._scopes[scope] = _ScopeIndex(vector.shape[0], min(self.INITIAL_CAPACITY, self.max_entries))
+
+        live = index.expires[:index.size] > now
+        if not live.all():
+            index.keep(np.flatnonzero(live))
+        if index.size >= self.max_entries:
+            index.keep(np.arange(index.size - self.max_entries + 1, index.size))
+        if index.size == len(index.vectors):
+            # Double the buffers so appends stay amortized O(1)
+            index.grow(min(2 * len(index.vectors), self.max_entries))
+
+        index.vectors[index.size] = vector
+        index.expires[index.size] = now + self.ttl
+        index.values.append(value)
+        index.size += 1
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Run guard tests - adaptive run timeout and circuit breaker
+Uses services.run_guard directly: no app startup, network or LLM calls
+"""
+
+from collections import deque
+
+from services.run_guard import CircuitBreaker, adaptive_timeout
+
+MIN_TIMEOUT = 5.0
+MIN_SAMPLES = 20
+
+def test_adaptive_timeout_past_min_samples():
+    """No timeout until enough samples exist; then 2x p95, floored at the minimum"""
+    samples = deque(maxlen=200)
+    samples.extend([0.01] * (MIN_SAMPLES - 1))
+    assert adaptive_timeout(samples, MIN_TIMEOUT, MIN_SAMPLES) is None
+    
+    samples.append(0.01)
+    assert adaptive_timeout(samples, MIN_TIMEOUT, MIN_SAMPLES) == MIN_TIMEOUT
+    
+    samples.extend([10.0] * MIN_SAMPLES)
+    assert adaptive_timeout(samples, MIN_TIMEOUT, MIN_SAMPLES) == 20.0
+    
+    # Keeps working as the rolling window fills and slides
+    samples.extend([1.0] * 300)
+    assert adaptive_timeout(samples, MIN_TIMEOUT, MIN_SAMPLES) == MIN_TIMEOUT
+
+def test_circuit_breaker_cycle():
+    """CLOSED -> OPEN after the threshold, one HALF_OPEN probe after cooldown"""
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60.0)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "CLOSED" and breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == "OPEN"
+    assert not breaker.allow()
+    
+    # Cooldown over: a probe is allowed; its failure reopens the circuit
+    breaker.opened_at -= 61.0
+    assert breaker.allow() and breaker.state == "HALF_OPEN"
+    breaker.record_failure()
+    assert breaker.state == "OPEN" and not breaker.allow()
+    
+    # A successful probe closes it again
+    breaker.opened_at -= 61.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "CLOSED" and breaker.snapshot()["retry_in_seconds"] == 0
+
+if __name__ == "__main__":
+    print("🚀 Testing run guards")
+    print("=" * 50)
+    
+    test_adaptive_timeout_past_min_samples()
+    print("✅ Adaptive timeout computed past the minimum sample count")
+    
+    test_circuit_breaker_cycle()
+    print("✅ Circuit breaker opens, probes and closes")
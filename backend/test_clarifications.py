@@ -1,7 +1,20 @@
 #!/usr/bin/env python3
 
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One keep-alive session for all test calls (no new TCP connection per request)
+SESSION = requests.Session()
+SESSION.headers.update({'Content-Type': 'application/json'})
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
 
 def test_clarification_flow():
     """Test the clarification system with a Gmail query that should require OAuth"""
@@ -20,7 +33,7 @@ def test_clarification_flow():
     print(f"Query: {query_data['message']}")
     
     # Send initial query
-    response = requests.post(f"{base_url}/query", json=query_data)
+    response = SESSION.post(f"{base_url}/query", json=query_data)
     
     if response.status_code == 200:
         data = response.json()
@@ -36,7 +49,7 @@ def test_clarification_flow():
             print(f"Action required: {clarification.get('action_required')}")
             
             if clarification.get('details'):
-                print(f"Details: {json.dumps(clarification['details'], indent=2)}")
+                print(f"Details: {orjson.dumps(clarification['details'], option=orjson.OPT_INDENT_2).decode()}")
                 
             # Simulate user providing authorization
             clarification_response = {
@@ -47,7 +60,7 @@ def test_clarification_flow():
             }
             
             print(f"\n🔵 Sending clarification response...")
-            clarify_response = requests.post(f"{base_url}/clarification", json=clarification_response)
+            clarify_response = SESSION.post(f"{base_url}/clarification", json=clarification_response)
             
             if clarify_response.status_code == 200:
                 clarify_data = clarify_response.json()
@@ -84,7 +97,7 @@ def test_basic_query():
     print("\n🔵 Testing basic query (no clarification expected)...")
     print(f"Query: {query_data['message']}")
     
-    response = requests.post(f"{base_url}/query", json=query_data)
+    response = SESSION.post(f"{base_url}/query", json=query_data)
     
     if response.status_code == 200:
         data = response.json()
@@ -4,26 +4,31 @@ Comprehensive Test for Gemini + Mistral Integration
 Tests both models individually and through the server
 """
 
-import os
+import sys
 import asyncio
 import time
 import httpx
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv(".env.local")
+from _env import ENV
 
-async def test_gemini_direct():
+# One keep-alive client for all server tests (shared connection pool)
+_client = httpx.AsyncClient(
+    base_url="http://localhost:8000",
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+)
+
+async def test_gemini_direct(log):
     """Test Gemini integration directly"""
-    print("🧪 Testing Google Gemini Direct Integration...")
+    log.append("🧪 Testing Google Gemini Direct Integration...")
     
     try:
         from gemini_model import GeminiModel
         from portia import Message
         
-        api_key = os.getenv("GOOGLE_API_KEY")
+        api_key = ENV.google_api_key
         if not api_key:
-            print("❌ GOOGLE_API_KEY not found")
+            log.append("❌ GOOGLE_API_KEY not found")
             return False
         
         model = GeminiModel(
@@ -35,34 +40,35 @@ async def test_gemini_direct():
         
         messages = [Message(role="user", content="What is 5 + 3? Answer briefly.")]
         start_time = time.time()
-        response = model.get_response(messages)
+        response = await asyncio.to_thread(model.get_response, messages)
         execution_time = time.time() - start_time
         
-        print(f"✅ Gemini Direct: SUCCESS")
-        print(f"📝 Response: {response.content}")
-        print(f"⏱️ Time: {execution_time:.2f}s")
+        log.append(f"✅ Gemini Direct: SUCCESS")
+        log.append(f"📝 Response: {response.content}")
+        log.append(f"⏱️ Time: {execution_time:.2f}s")
         return True
         
     except Exception as e:
-        print(f"❌ Gemini Direct: FAILED - {str(e)}")
+        log.append(f"❌ Gemini Direct: FAILED - {str(e)}")
         return False
 
-async def test_mistral_direct():
+async def test_mistral_direct(log):
     """Test Mistral integration directly"""
-    print("\n🧪 Testing Mistral Direct Integration...")
+    log.append("\n🧪 Testing Mistral Direct Integration...")
     
     try:
         from mistralai import Mistral
         
-        api_key = os.getenv("MISTRAL_API_KEY")
+        api_key = ENV.mistral_api_key
         if not api_key:
-            print("❌ MISTRAL_API_KEY not found")
+            log.append("❌ MISTRAL_API_KEY not found")
             return False
         
         client = Mistral(api_key=api_key)
         
         start_time = time.time()
-        response = client.chat.complete(
+        response = await asyncio.to_thread(
+            client.chat.complete,
             model="mistral-small-latest",
             messages=[{"role": "user", "content": "What is 4 + 6? Answer briefly."}],
             temperature=0.7,
@@ -70,28 +76,28 @@ async def test_mistral_direct():
         )
         execution_time = time.time() - start_time
         
-        print(f"✅ Mistral Direct: SUCCESS")
-        print(f"📝 Response: {response.choices[0].message.content}")
-        print(f"⏱️ Time: {execution_time:.2f}s")
+        log.append(f"✅ Mistral Direct: SUCCESS")
+        log.append(f"📝 Response: {response.choices[0].message.content}")
+        log.append(f"⏱️ Time: {execution_time:.2f}s")
         return True
         
     except Exception as e:
-        print(f"❌ Mistral Direct: FAILED - {str(e)}")
+        log.append(f"❌ Mistral Direct: FAILED - {str(e)}")
         return False
 
-async def test_gemini_portia():
+async def test_gemini_portia(log):
     """Test Gemini through Portia"""
-    print("\n🧪 Testing Gemini through Portia...")
+    log.append("\n🧪 Testing Gemini through Portia...")
     
     try:
         from gemini_model import create_gemini_config
         from portia import Portia, example_tool_registry
         
-        api_key = os.getenv("GOOGLE_API_KEY")
-        portia_key = os.getenv("PORTIA_API_KEY")
+        api_key = ENV.google_api_key
+        portia_key = ENV.portia_api_key
         
         if not api_key or not portia_key:
-            print("❌ Required API keys not found")
+            log.append("❌ Required API keys not found")
             return False
         
         config = create_gemini_config(
@@ -104,89 +110,100 @@ async def test_gemini_portia():
         portia = Portia(config=config, tools=example_tool_registry)
         
         start_time = time.time()
-        result = portia.run("Calculate 7 + 8 and explain the result.")
+        result = await asyncio.to_thread(portia.run, "Calculate 7 + 8 and explain the result.")
         execution_time = time.time() - start_time
         
-        print(f"✅ Gemini Portia: SUCCESS")
-        print(f"📋 Plan ID: {result.id}")
-        print(f"📊 State: {result.state}")
+        log.append(f"✅ Gemini Portia: SUCCESS")
+        log.append(f"📋 Plan ID: {result.id}")
+        log.append(f"📊 State: {result.state}")
         
         if hasattr(result, 'outputs') and result.outputs and result.outputs.final_output:
-            print(f"🎯 Response: {result.outputs.final_output.value}")
+            log.append(f"🎯 Response: {result.outputs.final_output.value}")
         
-        print(f"⏱️ Time: {execution_time:.2f}s")
+        log.append(f"⏱️ Time: {execution_time:.2f}s")
         return True
         
     except Exception as e:
-        print(f"❌ Gemini Portia: FAILED - {str(e)}")
+        log.append(f"❌ Gemini Portia: FAILED - {str(e)}")
         return False
 
-async def test_server_health():
+async def test_server_health(log):
     """Test server health endpoint"""
-    print("\n🧪 Testing Server Health...")
+    log.append("\n🧪 Testing Server Health...")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8000/health", timeout=10.0)
-            
-            if response.status_code == 200:
-                health_data = response.json()
-                print(f"✅ Server Health: SUCCESS")
-                print(f"📊 Status: {health_data.get('status')}")
-                print(f"🤖 Gemini Configured: {health_data.get('portia_gemini_configured')}")
-                print(f"📝 Mistral Configured: {health_data.get('portia_mistral_configured')}")
-                return True
-            else:
-                print(f"❌ Server Health: FAILED - Status {response.status_code}")
-                return False
+        response = await _client.get("/health", timeout=10.0)
+        
+        if response.status_code == 200:
+            health_data = response.json()
+            log.append(f"✅ Server Health: SUCCESS")
+            log.append(f"📊 Status: {health_data.get('status')}")
+            log.append(f"🤖 Gemini Configured: {health_data.get('portia_gemini_configured')}")
+            log.append(f"📝 Mistral Configured: {health_data.get('portia_mistral_configured')}")
+            return True
+        else:
+            log.append(f"❌ Server Health: FAILED - Status {response.status_code}")
+            return False
                 
     except Exception as e:
-        print(f"❌ Server Health: FAILED - {str(e)}")
+        log.append(f"❌ Server Health: FAILED - {str(e)}")
         return False
 
-async def test_server_query():
+async def test_server_query(log):
     """Test server query endpoint"""
-    print("\n🧪 Testing Server Query...")
+    log.append("\n🧪 Testing Server Query...")
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Test with Gemini preference
-            payload = {
-                "query": "What is 9 + 12? Explain briefly.",
-                "model_preference": "gemini",
-                "user_id": "test_user"
-            }
+        # Test with Gemini preference
+        payload = {
+            "query": "What is 9 + 12? Explain briefly.",
+            "model_preference": "gemini",
+            "user_id": "test_user"
+        }
+        
+        start_time = time.time()
+        response = await _client.post("/query", json=payload)
+        execution_time = time.time() - start_time
+        
+        if response.status_code == 200:
+            result_data = response.json()
+            log.append(f"✅ Server Query: SUCCESS")
+            log.append(f"🎯 Model Used: {result_data.get('model_used')}")
+            log.append(f"📝 Success: {result_data.get('success')}")
+            log.append(f"⏱️ Time: {execution_time:.2f}s")
             
-            start_time = time.time()
-            response = await client.post(
-                "http://localhost:8000/query",
-                json=payload,
-                timeout=30.0
-            )
-            execution_time = time.time() - start_time
+            if result_data.get('result') and result_data['result'].get('final_output'):
+                log.append(f"📄 Response: {result_data['result']['final_output']}")
             
-            if response.status_code == 200:
-                result_data = response.json()
-                print(f"✅ Server Query: SUCCESS")
-                print(f"🎯 Model Used: {result_data.get('model_used')}")
-                print(f"📝 Success: {result_data.get('success')}")
-                print(f"⏱️ Time: {execution_time:.2f}s")
-                
-                if result_data.get('result') and result_data['result'].get('final_output'):
-                    print(f"📄 Response: {result_data['result']['final_output']}")
-                
-                return True
-            else:
-                print(f"❌ Server Query: FAILED - Status {response.status_code}")
-                print(f"📄 Response: {response.text}")
-                return False
+            return True
+        else:
+            log.append(f"❌ Server Query: FAILED - Status {response.status_code}")
+            log.append(f"📄 Response: {response.text}")
+            return False
                 
     except Exception as e:
-        print(f"❌ Server Query: FAILED - {str(e)}")
+        log.append(f"❌ Server Query: FAILED - {str(e)}")
         return False
 
 async def main():
     """Run comprehensive tests"""
+    try:
+        await _run_tests()
+    finally:
+        await _client.aclose()
+
+async def _run_test(test_name, test_func):
+    """Run one test with its own output buffer; returns (success, log lines)"""
+    log = []
+    try:
+        success = await test_func(log)
+    except Exception as e:
+        log.append(f"❌ {test_name}: CRASHED - {str(e)}")
+        success = False
+    return success, log
+
+async def _run_tests():
+    """Run all tests concurrently, then print their output and the summary"""
     print("🚀 Starting Comprehensive AI Integration Tests")
     print("=" * 60)
     
@@ -197,56 +214,54 @@ async def main():
         ("Gemini Portia", test_gemini_portia),
     ]
     
-    results = []
-    
-    for test_name, test_func in tests:
-        try:
-            success = await test_func()
-            results.append((test_name, success))
-        except Exception as e:
-            print(f"❌ {test_name}: CRASHED - {str(e)}")
-            results.append((test_name, False))
-    
     # Test server (if running)
-    print(f"\n{'='*60}")
-    print("🌐 Testing Server Integration")
-    print("=" * 60)
-    
     server_tests = [
         ("Server Health", test_server_health),
         ("Server Query", test_server_query),
     ]
     
-    for test_name, test_func in server_tests:
-        try:
-            success = await test_func()
-            results.append((test_name, success))
-        except Exception as e:
-            print(f"❌ {test_name}: CRASHED - {str(e)}")
-            results.append((test_name, False))
+    # All tests are independent I/O - overlap them; output is written once afterwards
+    outcomes = await asyncio.gather(
+        *(_run_test(test_name, test_func) for test_name, test_func in tests + server_tests)
+    )
+    
+    # Collect the report and emit it with a single write
+    out = []
+    results = [("", False)] * len(outcomes)
+    passed = 0
+    for i, ((test_name, _), (success, log)) in enumerate(zip(tests + server_tests, outcomes)):
+        if i == len(tests):
+            out.append(f"\n{'='*60}")
+            out.append("🌐 Testing Server Integration")
+            out.append("=" * 60)
+        out.extend(log)
+        results[i] = (test_name, success)
+        passed += success
     
     # Summary
-    print(f"\n{'='*60}")
-    print("📊 COMPREHENSIVE TEST RESULTS")
-    print("=" * 60)
+    out.append(f"\n{'='*60}")
+    out.append("📊 COMPREHENSIVE TEST RESULTS")
+    out.append("=" * 60)
     
     for test_name, success in results:
         status = "✅ PASSED" if success else "❌ FAILED"
-        print(f"{status}: {test_name}")
+        out.append(f"{status}: {test_name}")
     
-    passed = sum(1 for _, success in results if success)
     total = len(results)
     
-    print(f"\n🎯 Summary: {passed}/{total} tests passed")
+    out.append(f"\n🎯 Summary: {passed}/{total} tests passed")
     
     if passed >= len(tests):  # At least all component tests pass
-        print("🎉 Core integration working! Ready for production.")
+        out.append("🎉 Core integration working! Ready for production.")
     else:
-        print("⚠️  Some core tests failed. Check configurations.")
+        out.append("⚠️  Some core tests failed. Check configurations.")
+    
+    out.append(f"\n💡 To start the server: python main.py")
+    out.append(f"📋 Health check: curl http://localhost:8000/health")
+    out.append(f"🔧 Test query: curl -X POST http://localhost:8000/query -H 'Content-Type: application/json' -d '{{\"query\":\"Hello!\",\"model_preference\":\"gemini\"}}'")
     
-    print(f"\n💡 To start the server: python main.py")
-    print(f"📋 Health check: curl http://localhost:8000/health")
-    print(f"🔧 Test query: curl -X POST http://localhost:8000/query -H 'Content-Type: application/json' -d '{{\"query\":\"Hello!\",\"model_preference\":\"gemini\"}}'")
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -5,12 +5,19 @@ Simple Portia backend - Open Source Tools Only (for testing)
 
 import os
 import time
+import asyncio
+import hashlib
+import orjson
+import concurrent.futures
+from collections import OrderedDict
 from typing import Optional, List
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
+from _env import ENV
+from services.semantic_cache import SemanticCache
 from portia import (
     Portia,
     Config,
@@ -18,11 +25,8 @@ from portia import (
     open_source_tool_registry
 )
 
-# Load environment variables
-load_dotenv("/Users/ADML/Desktop/Nexus/.env.local")
-
-# Configuration
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Configuration (loaded once from .env.local by _env)
+GOOGLE_API_KEY = ENV.google_api_key
 
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY required")
@@ -79,6 +83,53 @@ class ToolRegistryResponse(BaseModel):
     total_tools: int
     tools: List[ToolInfo]
 
+# Bounded pool for blocking Portia runs; the semaphore keeps excess queries
+# waiting on the event loop (cancellable) rather than in the executor queue
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "8"))
+_llm_pool = concurrent.futures.ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm")
+_llm_sem = asyncio.Semaphore(LLM_WORKERS)
+
+# Response cache, opt-in via QUERY_CACHE_TTL > 0 (tool runs can be time-sensitive
+# or have side effects): exact match on the normalized query, then (also opt-in
+# via SEMANTIC_CACHE_MODEL) near-duplicates by embedding similarity
+QUERY_CACHE_MAXSIZE = int(os.getenv("QUERY_CACHE_MAXSIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "0"))
+_exact_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+_semantic_cache = SemanticCache(
+    os.getenv("SEMANTIC_CACHE_MODEL"),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+)
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, for cache keys"""
+    return " ".join(query.split()).casefold()
+
+def _cache_key(request: QueryRequest) -> bytes:
+    """Digest of the model, registry and normalized query"""
+    raw = f"{LLMProvider.GOOGLE.value}|{request.tool_registry}|{_normalize_query(request.query)}".encode()
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+def _cache_get(key: bytes) -> Optional[QueryResponse]:
+    """Return a cached response if present and not expired"""
+    entry = _exact_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if time.monotonic() >= expires_at:
+        del _exact_cache[key]
+        return None
+    _exact_cache.move_to_end(key)
+    return response
+
+def _cache_put(key: bytes, response: QueryResponse) -> None:
+    """Store a response, evicting the least recently used entry when full"""
+    if QUERY_CACHE_TTL <= 0:
+        return
+    _exact_cache[key] = (time.monotonic() + QUERY_CACHE_TTL, response)
+    _exact_cache.move_to_end(key)
+    while len(_exact_cache) > QUERY_CACHE_MAXSIZE:
+        _exact_cache.popitem(last=False)
+
 def get_tool_info(tool) -> ToolInfo:
     """Extract tool information"""
     return ToolInfo(
@@ -88,37 +139,128 @@ def get_tool_info(tool) -> ToolInfo:
         category=getattr(tool, 'category', 'Unknown')
     )
 
+# Health and tool data are fixed after startup - serialize them once
+_HEALTH_JSON = orjson.dumps({
+    "status": "healthy",
+    "open_source_tools": len(os_tools),
+    "google_api_configured": bool(GOOGLE_API_KEY),
+})
+
+_REGISTRIES_JSON = orjson.dumps([
+    ToolRegistryResponse(
+        registry_name="open_source",
+        total_tools=len(os_tools),
+        tools=[get_tool_info(tool) for tool in os_tools]
+    ).model_dump()
+])
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "open_source_tools": len(os_tools),
-        "google_api_configured": bool(GOOGLE_API_KEY),
-    }
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 @app.get("/tools/registries", response_model=List[ToolRegistryResponse])
 async def get_tool_registries():
     """Get all tool registries"""
-    registries = [
-        ToolRegistryResponse(
-            registry_name="open_source",
-            total_tools=len(os_tools),
-            tools=[get_tool_info(tool) for tool in os_tools]
-        )
-    ]
-    return registries
+    return Response(content=_REGISTRIES_JSON, media_type="application/json")
 
 @app.post("/query", response_model=QueryResponse)
 async def process_query(request: QueryRequest):
-    """Process query with open source tools"""
+    """Process query with open source tools, answering repeats from the cache"""
+    if QUERY_CACHE_TTL <= 0:
+        response, _ = await _run_query(request)
+        return response
+    
+    key = _cache_key(request)
+    cached = _cache_get(key)
+    if cached is not None:
+        print(f"⚡ Cache hit: {request.query[:50]}...")
+        return cached
+    
+    embedding = None
+    if _semantic_cache.enabled:
+        try:
+            embedding = await asyncio.to_thread(_semantic_cache.embed, _normalize_query(request.query))
+        except Exception as e:
+            # Best-effort tier: a model load/encode failure is just a cache miss
+            print(f"⚠️ Semantic cache embedding failed: {e}")
+        cached = _semantic_cache.lookup(request.tool_registry, embedding) if embedding is not None else None
+        if cached is not None:
+            print(f"⚡ Semantic cache hit: {request.query[:50]}...")
+            _cache_put(key, cached)
+            return cached
+    
+    response, answered = await _run_query(request)
+    # Only cache real answers, not the "view results in the dashboard" placeholders
+    if answered:
+        _cache_put(key, response)
+        if embedding is not None:
+            _semantic_cache.add(request.tool_registry, embedding, response)
+    return response
+
+@app.post("/query/stream")
+async def stream_query(request: QueryRequest):
+    """Process query, streaming NDJSON events: started, one per step output, then final or error"""
+    
+    def line(event: dict) -> bytes:
+        # default=str covers SDK output values that are not plain JSON types
+        return orjson.dumps(event, default=str) + b"\n"
+    
+    async def events():
+        start_time = time.time()
+        yield line({"event": "started", "query": request.query, "tool_registry": "open_source"})
+        
+        try:
+            async with _llm_sem:
+                result = await asyncio.get_running_loop().run_in_executor(_llm_pool, os_portia.run, request.query)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            yield line({"event": "error", "error": str(e), "execution_time_seconds": time.time() - start_time})
+            return
+        
+        # Serialize step outputs one at a time instead of stringifying the whole run
+        outputs = getattr(result, "outputs", None)
+        for step_name, output in (getattr(outputs, "step_outputs", None) or {}).items():
+            yield line({
+                "event": "step",
+                "step": step_name,
+                "summary": getattr(output, "summary", None),
+                "value": getattr(output, "value", None),
+            })
+        
+        execution_time = time.time() - start_time
+        state = getattr(getattr(result, "state", None), "value", None)
+        final_value = getattr(getattr(outputs, "final_output", None), "value", None)
+        if state != "COMPLETE" or final_value is None:
+            error = (f"Run ended in state {state}: {getattr(result, 'error', 'Unknown error')}"
+                     if state != "COMPLETE" else "Run completed without a final output")
+            print(f"❌ Error: {error}")
+            yield line({"event": "error", "error": error, "state": state, "execution_time_seconds": execution_time})
+            return
+        
+        yield line({
+            "event": "final",
+            "success": True,
+            "state": state,
+            "result": final_value,
+            "execution_time_seconds": execution_time,
+            "tool_registry_used": "open_source",
+        })
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+async def _run_query(request: QueryRequest):
+    """Run query on the open source Portia instance; returns (response, whether a real result was extracted)"""
     start_time = time.time()
+    answered = False
     
     try:
         print(f"🔍 Processing: {request.query[:50]}... with open_source")
         
         # Execute query
-        result = os_portia.run(request.query)
+        # Run the blocking SDK call off the event loop
+        async with _llm_sem:
+            result = await asyncio.get_running_loop().run_in_executor(_llm_pool, os_portia.run, request.query)
         
         execution_time = time.time() - start_time
         print(f"✅ Completed in {execution_time:.2f}s")
@@ -127,8 +269,7 @@ async def process_query(request: QueryRequest):
         result_text = "Task completed successfully."
         
         try:
-            # Wait a bit for final_output to be populated
-            import time as time_mod
+            # Wait a bit for final_output to be populated (without blocking the loop)
             max_wait = 10  # seconds
             wait_interval = 1
             waited = 0
@@ -138,16 +279,18 @@ async def process_query(request: QueryRequest):
                     final_output = str(result.final_output).strip()
                     if final_output and final_output != 'None':
                         result_text = final_output
+                        answered = True
                         print(f"✅ Got final_output after {waited}s: {result_text[:100]}...")
                         break
                 
-                time_mod.sleep(wait_interval)
+                await asyncio.sleep(wait_interval)
                 waited += wait_interval
             
             # If still no result, try other approaches
             if result_text == "Task completed successfully.":
                 if isinstance(result, str):
                     result_text = result
+                    answered = True
                 else:
                     result_text = f"Task completed. View full results in Portia dashboard."
         
@@ -161,7 +304,7 @@ async def process_query(request: QueryRequest):
             execution_time_seconds=execution_time,
             tool_registry_used="open_source",
             tools_used=[]
-        )
+        ), answered
         
     except Exception as e:
         execution_time = time.time() - start_time
@@ -172,9 +315,18 @@ async def process_query(request: QueryRequest):
             error=str(e),
             execution_time_seconds=execution_time,
             tool_registry_used="open_source"
-        )
+        ), False
 
 if __name__ == "__main__":
     import uvicorn
     print("🌟 Simple server ready!")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # uvloop/httptools ship with uvicorn[standard]; fall back to asyncio/h11 without them
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "asyncio", "h11"
+    
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http=http)